@@ -1,6 +1,10 @@
 """Simple Class for controlling Sleep mode on Dutch & Dutch 8C loudspeakers."""
 #
-# usage: dutch.py DNSnameofaspeaker sleep|wake
+# usage: dutch.py DNSnameofaspeaker sleep|wake|dump|play|pause|toggleplay|
+#                                    next|previous|inputAes|inputRoon|
+#                                    inputSpotify|presetHarman|presetBass|
+#                                    presetLoud1|presetLoud3|bacchOn|bacchOff
+#        dutch.py --daemon
 #
 # The message format was found by dumping websocket traffic from the
 # D&D web client, and picking out the appropriate exchanges. So
@@ -15,7 +19,9 @@
 # This code just assumes a simple setup of a pair of speakers in one
 # room, and will act on those (or it might work on the first room if
 # you have more than one). It just makes simple command/response
-# websocket requests, nothing asynchronous is expected.
+# websocket requests. The requests are made with asyncio so that
+# several rooms or commands can share one event loop, but nothing
+# asynchronous is expected from the speakers themselves.
 #
 # The D&D web app initially reads "ClerkIP.js" from whatever server
 # was specified in the initial HTTP URL and then connects to the mDNS
@@ -26,19 +32,85 @@
 # argument. There isn't really any error checking, so it will probably
 # just backtrace if anything unexpected happens.
 #
-# To make the script work reliably using the Home Assistant
-# command_line integration, if you supply the script with an 
-# IP address instead of a hostname, it will assume that is the
-# master speaker, and talk to it directly.  You can find the master
-# speaker by giving it the hostname, and it will print out the master's 
-# IP address
+# The speaker can be given as an IP address or a hostname. Either way
+# it is assumed to be the master speaker, and the script talks to it
+# directly; it doesn't go looking for the master. Hostnames are
+# resolved with a short exponential backoff, as mDNS lookups sometimes
+# fail transiently, and the address is cached for a day alongside the
+# room ID. If the cached address can't be reached (e.g. DHCP gave the
+# speaker a new one), the hostname is resolved again. Giving an IP
+# address avoids name resolution altogether, which makes the script
+# more reliable under the Home Assistant command_line integration.
 #
 #
 
+import asyncio
+import contextlib
+import io
 import json
+import os
 import re
+import socket
 import sys
-import websocket
+import time
+import websockets
+
+# orjson is quicker at encoding commands and decoding the (sometimes
+# large) responses, but is optional.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, separators = (',', ':'))
+
+# The room ID is stable across reboots, so it is cached on disk keyed
+# by the master's IP address. That saves the "read targets" round trip
+# each time Home Assistant spawns the script.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dutch')
+
+# Dotted-quad IPv4 address, compiled once at import.
+IP_RE = re.compile(r'((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)')
+
+# Command envelope, pre-serialised. Filled in by getCommand with the
+# id, method, endpoint and target strings and the JSON data payload.
+COMMAND_FORMAT = '{"meta":{"id":"%s","method":"%s","endpoint":"%s","targetType":"room","target":"%s"},"data":%s}'
+
+# Resolved speaker hostnames are cached for a day. mDNS lookups can
+# fail transiently, so they are retried with these backoff delays.
+HOST_CACHE_TTL = 24 * 60 * 60
+RESOLVE_DELAYS = [0.2, 0.4, 0.8, 1.6]
+
+# Unix socket of the optional long-lived agent started with --daemon.
+AGENT_SOCKET = os.path.join(CACHE_DIR, 'agent.sock')
+
+
+def _load_cache(name):
+    try:
+        with open(os.path.join(CACHE_DIR, name + '.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# The cache is only an optimisation, so failing to write it (e.g. a
+# read-only home directory) is ignored.
+def _save_cache(name, cache):
+    path = os.path.join(CACHE_DIR, name + '.json')
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(cache, f)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
 
 class DutchRoom :
     """Main class that represents a Room object in the D&D management App"""
@@ -46,175 +118,461 @@ class DutchRoom :
     # Find out a room ID from the master speaker, by asking for a list
     # of targets. Even though the query specifies "room", it seems to
     # get speakers as well.
-    def getRoomId(self):
-        self.ws = websocket.WebSocket()
-        self.ws.connect(self.masterurl)
-        self.ws.send( self.getCommand('targets', {}, methodVal = 'read', targetVal = '*') )
-        response = self.ws.recv()
-        data = json.loads(response)
+    async def getRoomId(self):
+        await self.drain()
+        await self.ws.send( self.getCommand('targets', {}, methodVal = 'read', targetVal = '*') )
+        response = await self.ws.recv()
+        self.setRoomId(response)
+
+
+    # Take the room ID from a "read targets" response, and cache it.
+    # Returns whether it differs from the one we had.
+    def setRoomId(self, response):
+        data = _loads(response)
 
         # we expect an array of responses, one of which is a room, the
         # other two are the speakers. The room has always been the
         # first one in dumped traffic, but don't assume this.
-        respcnt = (len(data['data']))
-        self.roomtarget = ''
-        for i in range(respcnt):
-            if data['data'][i]['targetType'] == 'room' :   # found a room, so copy its ID
-                self.roomtarget = data['data'][i]['target']
-
-
-    def getCommand(self, endpointVal, dataDict, methodVal = 'update', targetVal = None):
+        roomtarget = next((d['target'] for d in data['data'] if d['targetType'] == 'room'), '')
+        changed = roomtarget != self.roomtarget
+        self.roomtarget = roomtarget
+
+        cache = _load_cache('roomid')
+        cache[self.ipAddress] = self.roomtarget
+        _save_cache('roomid', cache)
+        self.staleCheck = False
+        return changed
+
+
+    # Control commands are fire-and-forget: send a burst of (endpoint,
+    # data, method) commands back to back and leave their responses
+    # queued, rather than waiting a round trip for an ack nobody looks
+    # at. The acks are drained before anything that needs a response.
+    # So a command counts as done once it has been sent: through the
+    # agent, it is reported as successful even if the connection turns
+    # out to be dead and the speaker never sees it.
+    #
+    # A room ID from the cache hasn't been checked yet, so the first
+    # burst on a connection is preceded by a "read targets", and
+    # drain() compares the room ID in its response with the cached one.
+    async def fire(self, *commands):
+        await self.drain()
+        if self.staleCheck:
+            await self.ws.send( self.getCommand('targets', {}, methodVal = 'read', targetVal = '*') )
+            self.staleCheck = False
+            self.checking = True
+        await self.sendBurst(commands)
+        self.pending = list(commands)
+
+
+    # Collect the responses to the commands fired earlier. If the room
+    # ID came from the cache and turned out to be out of date, resend
+    # them to the right one.
+    async def drain(self):
+        stale = False
+        if self.checking:
+            self.checking = False
+            stale = self.setRoomId(await self.ws.recv())
+        commands = self.pending
+        self.pending = []
+        for command in commands:
+            await self.ws.recv()
+        if stale:
+            await self.sendBurst(commands)
+            for command in commands:
+                await self.ws.recv()
+
+
+    # Commands go out as text frames, which is what the web client
+    # sends. websockets encodes a str straight into the frame, so
+    # handing it pre-encoded bytes would only move that copy, and bytes
+    # are sent as binary frames.
+    async def sendBurst(self, commands):
+        for i, (endpointVal, dataDict, methodVal) in enumerate(commands):
+            idVal = str(i + 1) if len(commands) > 1 else '999912345678'
+            await self.ws.send( self.getCommand(endpointVal, dataDict, methodVal = methodVal, idVal = idVal) )
+
+
+    def getCommand(self, endpointVal, dataDict, methodVal = 'update', targetVal = None, idVal = '999912345678'):
         if targetVal is None:
             targetVal = self.roomtarget
-        jsoncommand = {}
-        jsoncommand['meta'] = {}
-        jsoncommand['meta']['id'] = '999912345678'
-        jsoncommand['meta']['method'] = methodVal
-        jsoncommand['meta']['endpoint'] = endpointVal
-        jsoncommand['meta']['targetType'] = 'room'
-        jsoncommand['meta']['target'] = targetVal
-        jsoncommand['data'] = dataDict
-        return json.dumps(jsoncommand)
 
+        # The envelope always has the same shape, so fill in the
+        # template unless a field would need escaping as a JSON string.
+        fields = (idVal, methodVal, endpointVal, targetVal)
+        if all(f.isprintable() and '"' not in f and '\\' not in f for f in fields):
+            return COMMAND_FORMAT % (fields + (_dumps(dataDict),))
 
-    def doPlay(self):
-        self.ws.send( self.getCommand( 'streaming-api', {'method': 'Play', 'arguments': []} ) )
-        self.ws.recv()
+        jsoncommand = {
+            'meta': {
+                'id': idVal,
+                'method': methodVal,
+                'endpoint': endpointVal,
+                'targetType': 'room',
+                'target': targetVal,
+            },
+            'data': dataDict,
+        }
+        return _dumps(jsoncommand)
 
 
-    def doPause(self):
-        self.ws.send( self.getCommand( 'streaming-api', {'method': 'Pause', 'arguments': []} ) )
-        self.ws.recv()
+    async def doPlay(self):
+        await self.fire( ('streaming-api', {'method': 'Play', 'arguments': []}, 'update') )
 
 
-    def doNext(self):
-        self.ws.send( self.getCommand( 'streaming-api', {'method': 'Next', 'arguments': []} ) )
-        self.ws.recv()
+    async def doPause(self):
+        await self.fire( ('streaming-api', {'method': 'Pause', 'arguments': []}, 'update') )
 
 
-    def doPrevious(self):
-        self.ws.send( self.getCommand( 'streaming-api', {'method': 'Previous', 'arguments': []} ) )
-        self.ws.recv()
+    async def doNext(self):
+        await self.fire( ('streaming-api', {'method': 'Next', 'arguments': []}, 'update') )
 
 
-    def doSleep(self):
-        self.ws.send( self.getCommand( 'sleep', {'enable': True} ) )
-        self.ws.recv()
+    async def doPrevious(self):
+        await self.fire( ('streaming-api', {'method': 'Previous', 'arguments': []}, 'update') )
 
 
-    def doWake(self):
-        self.ws.send( self.getCommand( 'sleep', {'enable': False} ) )
-        self.ws.recv()
+    async def doSleep(self):
+        await self.fire( ('sleep', {'enable': True}, 'update') )
 
 
-    def setInput(self, inputMode):
-        # Wake if sleeping
-        self.doWake()
+    async def doWake(self):
+        await self.fire( ('sleep', {'enable': False}, 'update') )
 
-        # Reset volume to play it safe
-        self.setVolume(-30.0)
-        self.ws.send( self.getCommand('inputMode', {'inputMode': inputMode} ) )
-        self.ws.recv()
 
+    # Wake if sleeping, reset volume to play it safe, then switch
+    # input. The responses are tagged with meta.id, so all three
+    # commands are sent back to back (keeping their order on the
+    # speaker) and the responses are drained afterwards, rather than
+    # waiting a round trip after each one.
+    async def setInput(self, inputMode):
+        await self.fire(
+            ('sleep', {'enable': False}, 'update'),
+            ('gain2', {'gain': -30.0}, 'update'),
+            ('inputMode', {'inputMode': inputMode}, 'update'),
+        )
 
-    def setVolume(self, gain):
-        self.ws.send( self.getCommand('gain2', {'gain': gain} ) )
-        self.ws.recv()
 
+    async def setVolume(self, gain):
+        await self.fire( ('gain2', {'gain': gain}, 'update') )
 
-    def doPreset(self, presetId):
+
+    async def doPreset(self, presetId):
         print(self.getCommand('preset2', {'presetID': presetId}, methodVal = 'select' ) )
-        self.ws.send( self.getCommand('preset2', {'presetID': presetId}, methodVal = 'select' ) )
-        self.ws.recv()
+        await self.fire( ('preset2', {'presetID': presetId}, 'select') )
 
 
-    def doBacch(self, onOff):
-        self.ws.send( self.getCommand('bacch-enabled', {'enable': onOff} ) )
-        self.ws.recv()
+    async def doBacch(self, onOff):
+        await self.fire( ('bacch-enabled', {'enable': onOff}, 'update') )
 
 
-    def doDump(self):
-        self.ws.send( self.getCommand('network', {}, methodVal = 'read', targetVal = '*') )
-        response = self.ws.recv()
-        self.dump = json.loads(response)
+    async def doDump(self):
+        await self.drain()
+        await self.ws.send( self.getCommand('network', {}, methodVal = 'read', targetVal = '*') )
+        response = await self.ws.recv()
+        self.dump = _loads(response)
         print(json.dumps(self.dump, indent=2))
 
 
-    def doTogglePlay(self):
-        # Dump room state to see if currently playing
-        self.ws.send( self.getCommand('network', {}, methodVal = 'read', targetVal = '*') )
-        response = self.ws.recv()
-        self.dump = json.loads(response)
+    # Rather than waiting for the room state before deciding, send the
+    # state read and a guessed toggle together (the opposite of the
+    # last state this room saw, or Pause if none), then send the other
+    # command if the state shows the guess was wrong. Play when playing
+    # and Pause when paused are both no-ops on the speaker. The last
+    # state only lives as long as the DutchRoom, so it helps under the
+    # agent; a one-off CLI call always guesses Pause.
+    async def doTogglePlay(self):
+        guess = 'Play' if self.isPlaying is False else 'Pause'
+
+        # Dump room state to see if currently playing. That also
+        # checks a cached room ID, so fire() needn't.
+        await self.drain()
+        self.staleCheck = False
+        await self.ws.send( self.getCommand('network', {}, methodVal = 'read', targetVal = '*') )
+        await self.fire( ('streaming-api', {'method': guess, 'arguments': []}, 'update') )
+        response = await self.ws.recv()
+        self.dump = _loads(response)
+
+        # The state is keyed by room ID, so a cached ID that has gone
+        # stale shows up as a missing key. The guess went to the old ID
+        # then, so it counts as not sent.
+        if self.roomtarget not in self.dump['data']['state']:
+            await self.getRoomId()
+            guess = None
         isPlaying = self.dump['data']['state'][self.roomtarget]['data']['streamingInfo']['is_playing']
 
         # Toggle based on play state
-        if isPlaying:
-            self.doPause()
-        else:
-            self.doPlay()
+        if isPlaying and guess != 'Pause':
+            await self.doPause()
+        elif not isPlaying and guess != 'Play':
+            await self.doPlay()
+        self.isPlaying = not isPlaying
 
 
     def __init__(self, ipAddress):
+        self.ipAddress = ipAddress
         self.masterurl = 'ws://' + ipAddress + ':8768'
-
-        # Get the Room ID we want to talk to.
-        self.getRoomId()
-
-
-    def __del__(self):
-        self.ws.close()
+        self.ws = None
+        self.pending = []
+        self.checking = False
+        self.isPlaying = None
+
+        # Use the cached Room ID if there is one, but check it along
+        # with the first command.
+        self.roomtarget = _load_cache('roomid').get(ipAddress, '')
+        self.staleCheck = bool(self.roomtarget)
+
+
+    # Open the websocket to the master speaker and, unless it was
+    # cached, get the Room ID we want to talk to. The same websocket
+    # is then used for the commands, so there is only one handshake.
+    async def connect(self):
+        self.ws = await websockets.connect(self.masterurl)
+        if not self.roomtarget:
+            try:
+                await self.getRoomId()
+            except BaseException:
+                await self.aclose()
+                raise
+
+
+    # __del__ can't await, so the connection is closed explicitly, or
+    # by using the room as an async context manager. Outstanding acks
+    # are only worth waiting for if they still have to confirm a cached
+    # room ID; otherwise the commands are already on their way.
+    async def aclose(self):
+        if self.ws is not None:
+            # A connection that has already dropped has nothing left to
+            # drain, and the agent closes those before reconnecting.
+            if self.checking:
+                with contextlib.suppress(websockets.ConnectionClosed):
+                    await self.drain()
+            self.pending = []
+            self.checking = False
+            await self.ws.close()
+            self.ws = None
+
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+# The agent keeps one open websocket per master speaker, so a CLI call
+# forwarded to it skips the TCP and websocket handshakes (and name
+# resolution). websockets sends keepalive pings on open connections by
+# itself; a connection that has dropped anyway is reopened once.
+class DutchAgent :
+    """Long-lived helper that runs commands on behalf of the CLI"""
+
+    def __init__(self):
+        self.rooms = {}
+        self.lock = asyncio.Lock()
+
+
+    async def getRoom(self, host):
+        room = self.rooms.get(host)
+        if room is None:
+            room = await connectRoom(host)
+            self.rooms[host] = room
+        return room
+
+
+    # Commands print their output, so capture it and hand it back to
+    # the CLI. Requests are run one at a time so the captured output
+    # doesn't get mixed up.
+    async def runRequest(self, request):
+        async with self.lock:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                try:
+                    await self.runOnRoom(request)
+                except websockets.ConnectionClosed:
+                    # Only an already open connection is worth reopening;
+                    # if connecting itself failed, report that.
+                    room = self.rooms.pop(request['host'], None)
+                    if room is None:
+                        raise
+                    await room.aclose()
+                    await self.runOnRoom(request)
+            return output.getvalue()
+
+
+    # A check of a cached room ID is finished before the request
+    # returns, so a command sent to a stale ID is resent as part of
+    # this request rather than during some later one.
+    async def runOnRoom(self, request):
+        room = await self.getRoom(request['host'])
+        await runCommand(room, request['cmd'])
+        if room.checking:
+            await room.drain()
+
+
+    async def handleClient(self, reader, writer):
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                reply = {'status': 0, 'output': await self.runRequest(request)}
+            except Exception as e:
+                reply = {'status': 1, 'output': repr(e) + '\n'}
+            writer.write(json.dumps(reply).encode() + b'\n')
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+    async def serve(self):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(AGENT_SOCKET)
+        server = await asyncio.start_unix_server(self.handleClient, AGENT_SOCKET)
+        async with server:
+            await server.serve_forever()
+
+
+# Turn a speaker hostname into an IPv4 address, using the cached one
+# if it was resolved recently. IP addresses are returned as they are.
+async def resolveHost(host):
+    if IP_RE.fullmatch(host):
+        return host
+
+    cache = _load_cache('hosts')
+    if host in cache and time.time() - cache[host][1] < HOST_CACHE_TTL:
+        return cache[host][0]
+
+    loop = asyncio.get_running_loop()
+    for delay in RESOLVE_DELAYS + [None]:
+        try:
+            infos = await loop.getaddrinfo(host, 8768, family = socket.AF_INET, type = socket.SOCK_STREAM)
+            break
+        except socket.gaierror:
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+    ipAddress = infos[0][4][0]
+    cache[host] = [ipAddress, time.time()]
+    _save_cache('hosts', cache)
+    return ipAddress
+
+
+# Connect to the room at host. If its address can't be reached and
+# looking the hostname up again gives a different one, the cached
+# address was out of date, so try the new one.
+async def connectRoom(host):
+    ipAddress = await resolveHost(host)
+    room = DutchRoom(ipAddress)
+    try:
+        await room.connect()
+    except OSError:
+        if IP_RE.fullmatch(host):
+            raise
+        cache = _load_cache('hosts')
+        cache.pop(host, None)
+        _save_cache('hosts', cache)
+        newAddress = await resolveHost(host)
+        if newAddress == ipAddress:
+            raise
+        room = DutchRoom(newAddress)
+        await room.connect()
+    return room
+
+
+# Connect to the agent if one is running. Returns None if there is no
+# agent to talk to, so the caller can do it directly.
+async def openAgent():
+    try:
+        return await asyncio.open_unix_connection(AGENT_SOCKET)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+# Hand the command to the agent and print its output.
+async def forwardToAgent(agent, host, command):
+    reader, writer = agent
+    try:
+        writer.write(json.dumps({'host': host, 'cmd': command}).encode() + b'\n')
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+    print(reply['output'], end = '')
+    return reply['status']
 
 
 def main():
-    valid_args = ['wake', 'sleep', 'dump', 'inputAes', 'inputRoon', 'inputSpotify', 'play', 'pause', 'next', 'previous', 'toggleplay', 'presetHarman', 'presetBass', 'presetLoud1', 'presetLoud3', 'bacchOn', 'bacchOff']
+    if sys.argv[1:] == ['--daemon']:
+        asyncio.run(DutchAgent().serve())
+        return 0
 
-    # check for valid IP address
-    ipRegex = re.compile('^((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$')
+    valid_args = ['wake', 'sleep', 'dump', 'inputAes', 'inputRoon', 'inputSpotify', 'play', 'pause', 'next', 'previous', 'toggleplay', 'presetHarman', 'presetBass', 'presetLoud1', 'presetLoud3', 'bacchOn', 'bacchOff']
 
     args = sys.argv[1:]
-    if (len(args) < 2) or not re.match(ipRegex, args[0]) or (args[1] not in valid_args):
-        print ('Usage:', sys.argv[0], '<ip_address>', valid_args)
+    if (len(args) < 2) or (args[1] not in valid_args):
+        print ('Usage:', sys.argv[0], '<ip_address|hostname>', valid_args, '| --daemon')
         return 1
 
-    room = DutchRoom(args[0])
+    return asyncio.run(run(args))
 
-    match args[1]:
+
+async def run(args):
+    # The agent resolves the hostname itself, and only if it has no
+    # connection to that speaker yet, so it is only looked up here when
+    # talking to the speaker directly.
+    agent = await openAgent()
+    if agent is not None:
+        return await forwardToAgent(agent, args[0], args[1])
+
+    room = await connectRoom(args[0])
+    try:
+        await runCommand(room, args[1])
+    finally:
+        await room.aclose()
+
+    return 0
+
+
+async def runCommand(room, command):
+    match command:
         case 'dump':
-            room.doDump()
+            await room.doDump()
         case 'wake':
-            room.doWake()
+            await room.doWake()
         case 'sleep':
-            room.doSleep()
+            await room.doSleep()
         case 'play':
-            room.doPlay()
+            await room.doPlay()
         case 'pause':
-            room.doPause()
+            await room.doPause()
         case 'toggleplay':
-            room.doTogglePlay()
+            await room.doTogglePlay()
         case 'next':
-            room.doNext()
+            await room.doNext()
         case 'previous':
-            room.doPrevious()
+            await room.doPrevious()
         case 'inputAes':
-            room.setInput('aes')
+            await room.setInput('aes')
         case 'inputRoon':
-            room.setInput('Roon Ready')
+            await room.setInput('Roon Ready')
         case 'inputSpotify':
-            room.setInput('Spotify Connect')
+            await room.setInput('Spotify Connect')
         case 'presetHarman':
-            room.doPreset('2d0f652b-4631-4f11-8205-85a9b223a8a9')
+            await room.doPreset('2d0f652b-4631-4f11-8205-85a9b223a8a9')
         case 'presetBass':
-            room.doPreset('3ae3dd8f-a37c-44c0-8a5f-b84128b174af')
+            await room.doPreset('3ae3dd8f-a37c-44c0-8a5f-b84128b174af')
         case 'presetLoud1':
-            room.doPreset('f88c9fd8-42c1-4411-8371-11daa293504f')
+            await room.doPreset('f88c9fd8-42c1-4411-8371-11daa293504f')
         case 'presetLoud3':
-            room.doPreset('1212251f-fbe7-49e8-94e5-f21271a10dd9')
+            await room.doPreset('1212251f-fbe7-49e8-94e5-f21271a10dd9')
         case 'bacchOn':
-            room.doBacch(True)
+            await room.doBacch(True)
         case 'bacchOff':
-            room.doBacch(False)
-
-    return 0
+            await room.doBacch(False)
 
 if __name__ == '__main__':
     sys.exit(main())